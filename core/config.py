@@ -20,10 +20,15 @@ class Settings(BaseSettings):
         "security-scanner": "localhost:50052",
         "cost-analyzer": "localhost:50053",
     }
+    MAX_CONCURRENT_PLUGINS: int = 4
+    PLUGIN_CACHE_TTL: float = 30.0  # секунд
     
     # Настройки файлов
     LOGS_DIR: str = "logs"
     MAX_FILE_SIZE: int = 50 * 1024 * 1024  # 50MB
+    # Файлы логов больше этого размера разбираются параллельно в пуле процессов
+    PARALLEL_PARSE_THRESHOLD: int = 32 * 1024 * 1024  # 32MB
+    PARSE_WORKERS: int = 4  # процессов разбора, не больше доступных ядер
     
     class Config:
         env_file = ".env"
@@ -1,9 +1,36 @@
 import grpc
+import os
 from concurrent import futures
+from typing import Callable, List
 
 from models import plugin_pb2
 from models import plugin_pb2_grpc
 
+def server_max_workers() -> int:
+    """Размер пула потоков gRPC сервера плагина: два потока на ядро, не больше 32"""
+    return min(32, (os.cpu_count() or 1) * 2)
+
+# Опции gRPC сервера плагина: лимит сообщений и keepalive согласованы с CHANNEL_OPTIONS
+# клиента в plugins_config.py; одновременных RPC не больше, чем пул может обслужить
+SERVER_OPTIONS = [
+    ('grpc.max_concurrent_streams', server_max_workers()),
+    ('grpc.max_receive_message_length', 64 * 1024 * 1024),
+    ('grpc.max_send_message_length', 64 * 1024 * 1024),
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.min_recv_ping_interval_without_data_ms', 30_000),
+]
+
+# Размер чанка записей, который анализируется одной задачей пула
+SCAN_CHUNK_SIZE = 1000
+
+def scan_in_chunks(pool: futures.Executor, scan_chunk: Callable, entries) -> List:
+    """Анализ записей чанками в пуле: результаты scan_chunk по чанкам в исходном порядке"""
+    if len(entries) <= SCAN_CHUNK_SIZE:
+        return [scan_chunk(entries)]
+    
+    chunks = [entries[i:i + SCAN_CHUNK_SIZE] for i in range(0, len(entries), SCAN_CHUNK_SIZE)]
+    return list(pool.map(scan_chunk, chunks))
+
 class BasePlugin(plugin_pb2_grpc.PluginServiceServicer):
     def __init__(self, name: str, version: str, description: str):
         self.name = name
@@ -37,7 +64,10 @@ class BasePlugin(plugin_pb2_grpc.PluginServiceServicer):
     
     def serve(self, port: int = 50051):
         """Запуск gRPC сервера плагина"""
-        server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+        server = grpc.server(
+            futures.ThreadPoolExecutor(max_workers=server_max_workers()),
+            options=SERVER_OPTIONS
+        )
         plugin_pb2_grpc.add_PluginServiceServicer_to_server(self, server)
         server.add_insecure_port(f'[::]:{port}')
         server.start()
@@ -1,17 +1,40 @@
 from concurrent import futures
 import grpc
+import os
 import logging
 from datetime import datetime
 import re
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
 from models import plugin_pb2
 from models import plugin_pb2_grpc
+from base_plugin import SERVER_OPTIONS, scan_in_chunks, server_max_workers
+
+COMMON_ERROR_PATTERNS = [
+    (r"timeout", "Timeout occurred"),
+    (r"permission denied", "Permission denied"),
+    (r"not found", "Resource not found"),
+    (r"already exists", "Resource already exists"),
+    (r"authentication", "Authentication failed"),
+    (r"connection refused", "Connection refused"),
+    (r"limit exceeded", "Limit exceeded"),
+]
+
+REGEX_METACHARACTERS = frozenset(".^$*+?{}[]\\|()")
 
 class ErrorAggregatorService(plugin_pb2_grpc.PluginServiceServicer):
     def __init__(self):
         self.name = "error-aggregator"
         self.version = "1.0.0"
+        # Паттерны без метасимволов проверяются через `in`, остальные - через скомпилированный regex.
+        # Порядок сохраняется: побеждает первый совпавший паттерн.
+        self.error_patterns = []
+        for pattern, description in COMMON_ERROR_PATTERNS:
+            if REGEX_METACHARACTERS.isdisjoint(pattern):
+                self.error_patterns.append((pattern.lower(), None, description))
+            else:
+                self.error_patterns.append((None, re.compile(pattern, re.IGNORECASE), description))
+        self._pool = futures.ThreadPoolExecutor(max_workers=os.cpu_count())
     
     def HealthCheck(self, request, context):
         return plugin_pb2.HealthResponse(
@@ -35,13 +58,12 @@ class ErrorAggregatorService(plugin_pb2_grpc.PluginServiceServicer):
             warning_count = 0
             error_patterns = {}
             
-            for entry in request.entries:
-                if entry.level == "error":
-                    error_count += 1
-                    # Анализ паттернов ошибок
-                    self._analyze_error_pattern(entry.message, error_patterns)
-                elif entry.level == "warning":
-                    warning_count += 1
+            # Счетчики чанков складываются в исходном порядке записей
+            for chunk_errors, chunk_warnings, chunk_patterns in scan_in_chunks(self._pool, self._scan_chunk, request.entries):
+                error_count += chunk_errors
+                warning_count += chunk_warnings
+                for description, count in chunk_patterns.items():
+                    error_patterns[description] = error_patterns.get(description, 0) + count
             
             # Создаем findings
             findings = []
@@ -96,28 +118,36 @@ class ErrorAggregatorService(plugin_pb2_grpc.PluginServiceServicer):
             context.set_details(f"Processing failed: {str(e)}")
             return plugin_pb2.ProcessResponse()
     
+    def _scan_chunk(self, entries) -> Tuple[int, int, Dict[str, int]]:
+        """Подсчет ошибок, предупреждений и паттернов ошибок в одном чанке записей"""
+        error_count = 0
+        warning_count = 0
+        error_patterns = {}
+        
+        for entry in entries:
+            if entry.level == "error":
+                error_count += 1
+                # Анализ паттернов ошибок
+                self._analyze_error_pattern(entry.message, error_patterns)
+            elif entry.level == "warning":
+                warning_count += 1
+        
+        return error_count, warning_count, error_patterns
+    
     def _analyze_error_pattern(self, message: str, patterns: Dict[str, int]):
         """Анализ паттернов ошибок"""
-        common_patterns = [
-            (r"timeout", "Timeout occurred"),
-            (r"permission denied", "Permission denied"),
-            (r"not found", "Resource not found"),
-            (r"already exists", "Resource already exists"),
-            (r"authentication", "Authentication failed"),
-            (r"connection refused", "Connection refused"),
-            (r"limit exceeded", "Limit exceeded"),
-        ]
+        message_lower = message.lower()
         
-        for pattern, description in common_patterns:
-            if re.search(pattern, message, re.IGNORECASE):
-                if description in patterns:
-                    patterns[description] += 1
-                else:
-                    patterns[description] = 1
+        for literal, regex, description in self.error_patterns:
+            if (literal is not None and literal in message_lower) or (regex is not None and regex.search(message)):
+                patterns[description] = patterns.get(description, 0) + 1
                 break
 
 def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=server_max_workers()),
+        options=SERVER_OPTIONS
+    )
     plugin_pb2_grpc.add_PluginServiceServicer_to_server(ErrorAggregatorService(), server)
     server.add_insecure_port('[::]:50051')
     server.start()
@@ -1,19 +1,68 @@
 
+import heapq
 import logging
-from typing import Any, Dict, List
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from operator import attrgetter
+from typing import Any, Dict, List, Tuple, Union
 
 from plugins_config import PLUGINS_CONFIG, PluginClient
+from schemas.api import LogEntries
 
 
+class Severity(IntEnum):
+    """Уровни severity в порядке возрастания (неизвестные значения - ниже LOW)"""
+    UNKNOWN = 0
+    LOW = 1
+    MEDIUM = 2
+    HIGH = 3
+    CRITICAL = 4
+
+    @classmethod
+    def parse(cls, value: str) -> "Severity":
+        return cls.__members__.get(value, cls.UNKNOWN)
+
+
+# Время жизни кэша get_info()/health_check() в секундах
+PLUGIN_STATUS_TTL = 5.0
+
+
+@dataclass(slots=True)
+class Finding:
+    """Finding плагина внутри менеджера, в dict преобразуется только в ответе"""
+    type: str
+    severity: str
+    message: str
+    resource: str
+    recommendations: List[str]
+    metadata: Dict[str, str]
+    plugin: str
+    sev: Severity
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": self.type,
+            "severity": self.severity,
+            "message": self.message,
+            "resource": self.resource,
+            "recommendations": self.recommendations,
+            "metadata": self.metadata,
+            "plugin": self.plugin
+        }
+
 class PluginManager:
     def __init__(self):
         self.plugins: Dict[str, PluginClient] = {}
+        self._info_cache: Dict[str, Tuple[float, dict]] = {}
+        self._health_cache: Dict[str, Tuple[float, dict]] = {}
         self.initialize_plugins()
     
     def initialize_plugins(self):
         """Инициализация плагинов"""
-        for name, config in PLUGINS_CONFIG.items():
-            plugin = PluginClient(name, config)
+        for spec in PLUGINS_CONFIG:
+            name = spec.name
+            plugin = PluginClient(spec)
             if plugin.connect():
                 self.plugins[name] = plugin
                 logging.info(f"✅ Plugin {name} initialized and connected")
@@ -23,18 +72,19 @@ class PluginManager:
     def get_available_plugins(self) -> Dict[str, Dict]:
         """Получение списка доступных плагинов с их статусом"""
         available = {}
+        now = time.monotonic()
         for name, plugin in self.plugins.items():
             # Проверяем здоровье плагина
-            health = plugin.health_check()
+            health = self._cached(self._health_cache, name, now, plugin.health_check)
             
             # Получаем информацию о плагине
-            info = plugin.get_info()
+            info = self._cached(self._info_cache, name, now, plugin.get_info)
             
             available[name] = {
                 "name": info.get('name', name),
                 "version": info.get('version', 'unknown'),
-                "description": info.get('description', plugin.config['description']),
-                "capabilities": info.get('capabilities', plugin.config['capabilities']),
+                "description": info.get('description', plugin.config.description),
+                "capabilities": info.get('capabilities', list(plugin.config.capabilities)),
                 "supported_parameters": info.get('supported_parameters', []),
                 "status": health.get('status', 'UNKNOWN'),
                 "endpoint": plugin.endpoint,
@@ -50,7 +100,17 @@ class PluginManager:
         
         return available
     
-    def process_with_plugins(self, log_entries: List[Dict], plugin_names: List[str] = None, parameters: Dict = None) -> Dict[str, Any]:
+    def _cached(self, cache: Dict[str, Tuple[float, dict]], name: str, now: float, fetch) -> dict:
+        """Результат gRPC-запроса к плагину из кэша, если он не старше PLUGIN_STATUS_TTL"""
+        cached = cache.get(name)
+        if cached is not None and now - cached[0] < PLUGIN_STATUS_TTL:
+            return cached[1]
+        
+        value = fetch()
+        cache[name] = (now, value)
+        return value
+    
+    def process_with_plugins(self, log_entries: Union[List[Dict], LogEntries], plugin_names: List[str] = None, parameters: Dict = None) -> Dict[str, Any]:
         """Обработка логов через выбранные плагины"""
         if plugin_names is None:
             plugin_names = list(self.plugins.keys())
@@ -59,10 +119,12 @@ class PluginManager:
             parameters = {}
         
         results = {}
-        all_findings = []
+        per_plugin_findings = []
         all_metrics = {}
         failed_plugins = []
         
+        severity_key = attrgetter('sev')
+        
         for plugin_name in plugin_names:
             if plugin_name in self.plugins:
                 plugin = self.plugins[plugin_name]
@@ -85,18 +147,24 @@ class PluginManager:
                     results[plugin_name] = result
                     
                     if 'findings' in result:
-                        for finding in result['findings']:
-                            finding['plugin'] = plugin_name
-                            all_findings.append(finding)
+                        # Severity разбирается один раз, сортировка сравнивает только int
+                        findings = [
+                            Finding(**finding, plugin=plugin_name,
+                                    sev=Severity.parse(finding.get('severity', 'LOW')))
+                            for finding in result['findings']
+                        ]
+                        # Каждый плагин сортируется отдельно (CRITICAL первыми), затем списки сливаются
+                        findings.sort(key=severity_key, reverse=True)
+                        per_plugin_findings.append(findings)
                     
                     if 'metrics' in result:
                         all_metrics[plugin_name] = result['metrics']
                     
                     logging.info(f"✅ Plugin {plugin_name} completed successfully")
         
-        # Сортировка findings по severity
-        severity_order = {'CRITICAL': 0, 'HIGH': 1, 'MEDIUM': 2, 'LOW': 3}
-        all_findings.sort(key=lambda x: severity_order.get(x.get('severity', 'LOW'), 4))
+        # K-way слияние уже отсортированных списков: O(N log K) вместо O(N log N)
+        merged = heapq.merge(*per_plugin_findings, key=severity_key, reverse=True)
+        all_findings = [finding.to_dict() for finding in merged]
         
         return {
             "findings": all_findings,
@@ -111,6 +179,8 @@ class PluginManager:
     def refresh_connections(self):
         """Обновление соединений со всеми плагинами"""
         logging.info("🔄 Refreshing plugin connections...")
+        self._info_cache.clear()
+        self._health_cache.clear()
         for name, plugin in self.plugins.items():
             plugin.close()
             plugin.connect()
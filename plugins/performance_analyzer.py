@@ -1,17 +1,31 @@
 from concurrent import futures
 import grpc
 import logging
+import os
 from datetime import datetime
 import re
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
 from models import plugin_pb2
 from models import plugin_pb2_grpc
+from base_plugin import SERVER_OPTIONS, scan_in_chunks, server_max_workers
+
+SLOW_OPERATION_WORDS = ("slow", "timeout", "long", "bottleneck", "waiting")
+RESOURCE_INTENSIVE_WORDS = ("large", "big", "memory", "cpu", "expensive")
+
+# Рекомендации общие для всех findings PERFORMANCE_BOTTLENECK - кортеж создается один раз на модуль
+PERFORMANCE_BOTTLENECK_RECOMMENDATIONS = (
+    "Optimize resource configuration",
+    "Check for network latency issues",
+    "Review dependency chains",
+    "Consider resource scaling",
+)
 
 class PerformanceAnalyzerService(plugin_pb2_grpc.PluginServiceServicer):
     def __init__(self):
         self.name = "performance-analyzer"
         self.version = "1.0.0"
+        self._pool = futures.ThreadPoolExecutor(max_workers=os.cpu_count())
     
     def HealthCheck(self, request, context):
         return plugin_pb2.HealthResponse(
@@ -46,29 +60,10 @@ class PerformanceAnalyzerService(plugin_pb2_grpc.PluginServiceServicer):
                         pass
             
             # Анализ ресурсоемких операций
-            for entry in request.entries:
-                message = entry.message.lower()
-                
-                # Поиск медленных операций
-                if any(word in message for word in ["slow", "timeout", "long", "bottleneck", "waiting"]):
-                    slow_operations += 1
-                    findings.append(plugin_pb2.Finding(
-                        type="PERFORMANCE_BOTTLENECK",
-                        severity="MEDIUM",
-                        message="Potential performance bottleneck detected",
-                        resource=entry.metadata.get("resource", "unknown"),
-                        recommendations=[
-                            "Optimize resource configuration",
-                            "Check for network latency issues",
-                            "Review dependency chains",
-                            "Consider resource scaling"
-                        ],
-                        metadata={"operation": message[:50] + "..." if len(message) > 50 else message}
-                    ))
-                
-                # Поиск ресурсоемких операций
-                if any(word in message for word in ["large", "big", "memory", "cpu", "expensive"]):
-                    resource_intensive_ops += 1
+            for chunk_findings, chunk_slow, chunk_resource_intensive in scan_in_chunks(self._pool, self._scan_chunk, request.entries):
+                findings.extend(chunk_findings)
+                slow_operations += chunk_slow
+                resource_intensive_ops += chunk_resource_intensive
             
             # Если нашли много медленных операций
             if slow_operations > 3:
@@ -105,9 +100,46 @@ class PerformanceAnalyzerService(plugin_pb2_grpc.PluginServiceServicer):
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(f"Performance analysis failed: {str(e)}")
             return plugin_pb2.ProcessResponse()
+    
+    def _scan_chunk(self, entries) -> Tuple[List, int, int]:
+        """Поиск медленных и ресурсоемких операций в одном чанке записей"""
+        findings = []
+        slow_operations = 0
+        resource_intensive_ops = 0
+        
+        # Приводим сообщения к нижнему регистру один раз и собираем общий буфер:
+        # слова, которых нет во всем чанке, не проверяются для каждой записи
+        messages = [entry.message.lower() for entry in entries]
+        batch_text = "\n".join(messages)
+        slow_words = [word for word in SLOW_OPERATION_WORDS if word in batch_text]
+        resource_words = [word for word in RESOURCE_INTENSIVE_WORDS if word in batch_text]
+        
+        for entry, lowered in zip(entries, messages):
+            # Поиск медленных операций
+            if any(word in lowered for word in slow_words):
+                slow_operations += 1
+                # В metadata - начало исходного сообщения, с сохранением регистра
+                message = entry.message
+                findings.append(plugin_pb2.Finding(
+                    type="PERFORMANCE_BOTTLENECK",
+                    severity="MEDIUM",
+                    message="Potential performance bottleneck detected",
+                    resource=entry.metadata.get("resource", "unknown"),
+                    recommendations=PERFORMANCE_BOTTLENECK_RECOMMENDATIONS,
+                    metadata={"operation": message[:50] + ("..." if len(message) > 50 else "")}
+                ))
+            
+            # Поиск ресурсоемких операций
+            if any(word in lowered for word in resource_words):
+                resource_intensive_ops += 1
+        
+        return findings, slow_operations, resource_intensive_ops
 
 def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=server_max_workers()),
+        options=SERVER_OPTIONS
+    )
     plugin_pb2_grpc.add_PluginServiceServicer_to_server(PerformanceAnalyzerService(), server)
     server.add_insecure_port('[::]:50053')
     server.start()
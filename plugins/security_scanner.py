@@ -1,24 +1,127 @@
 from concurrent import futures
 import grpc
 import logging
+import os
 from datetime import datetime
 import re
-from typing import List, Dict
+from bisect import bisect_right
+from functools import partial
+from itertools import accumulate
+from typing import List, Dict, Tuple
+
+try:
+    import re2
+except ImportError:  # google-re2 не установлен - используется стандартный re
+    re2 = None
 
 from models import plugin_pb2
 from models import plugin_pb2_grpc
+from base_plugin import SERVER_OPTIONS, scan_in_chunks, server_max_workers
+
+PUBLIC_ACCESS_INDICATORS = ("0.0.0.0/0", "::/0", "public", "0.0.0.0")
+# Все индикаторы ищутся одним проходом по сообщению в нижнем регистре
+PUBLIC_ACCESS_RE = re.compile("|".join(map(re.escape, PUBLIC_ACCESS_INDICATORS)))
+
+SENSITIVE_PATTERNS = [
+    (r'api[_-]?key\s*[=:]\s*[\'\"][^\'\"]+[\'\"]', "API Key exposure"),
+    (r'password\s*[=:]\s*[\'\"][^\'\"]+[\'\"]', "Password exposure"),
+    (r'secret\s*[=:]\s*[\'\"][^\'\"]+[\'\"]', "Secret exposure"),
+    (r'token\s*[=:]\s*[\'\"][^\'\"]+[\'\"]', "Token exposure"),
+    (r'-----BEGIN (RSA|EC|DSA|OPENSSH) PRIVATE KEY-----', "Private key exposure"),
+]
+
+# Разделитель сообщений в общем буфере чанка
+ENTRY_SEPARATOR = b"\x00"
+
+def _may_contain_sensitive_data(message: str) -> bool:
+    """Дешевый префильтр перед regex: паттерны секретов требуют [=:] и кавычку, приватный ключ - '-----'"""
+    return (("=" in message or ":" in message) and ('"' in message or "'" in message)) or "-----" in message
+
+def _case_insensitive(pattern: str) -> str:
+    """Заменяет латинские буквы паттерна классами вида [pP], чтобы не компилировать regex с IGNORECASE.
+    
+    Escape-последовательности и классы [...] копируются как есть.
+    """
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            parts.append(pattern[i:i + 2])
+            i += 2
+        elif char == "[":
+            end = i + 1
+            while pattern[end] != "]":
+                end += 2 if pattern[end] == "\\" else 1
+            parts.append(pattern[i:end + 1])
+            i = end + 1
+        else:
+            parts.append(f"[{char.lower()}{char.upper()}]" if char.isascii() and char.isalpha() else char)
+            i += 1
+    return "".join(parts)
+
+def _sensitive_data_source(patterns: List[str]) -> str:
+    """Все паттерны в одной альтернации; имя группы (sensitive_<i>) указывает на паттерн в SENSITIVE_PATTERNS"""
+    return "|".join(f"(?P<sensitive_{i}>{pattern})" for i, pattern in enumerate(patterns))
+
+# Один проход regex по всему чанку вместо прохода на каждый паттерн и каждую запись.
+# Регистр букв задается явными классами, поэтому флаг IGNORECASE не нужен.
+# Поиск идет по UTF-8 байтам: RE2 работает с байтами нативно и не пересчитывает позиции
+# совпадений в символы, а все литералы паттернов - ASCII.
+# Если доступен RE2, используется его DFA с линейным временем, иначе - стандартный re.
+_SENSITIVE_PATTERNS_CI = [_case_insensitive(pattern) for pattern, _ in SENSITIVE_PATTERNS]
+
+# Для буфера чанка классы [^'"] дополнительно исключают ENTRY_SEPARATOR, чтобы
+# совпадение не могло пересечь границу двух записей
+SENSITIVE_DATA_RE = (re2 or re).compile(_sensitive_data_source([
+    pattern.replace(r"[^\'\"]", r"[^\'\"\x00]") for pattern in _SENSITIVE_PATTERNS_CI
+]).encode())
+
+# Сообщения, в которых сам есть NUL, проверяются по одному исходными паттернами:
+# в буфере чанка секрет с NUL внутри не совпал бы
+SENSITIVE_DATA_SINGLE_RE = (re2 or re).compile(_sensitive_data_source(_SENSITIVE_PATTERNS_CI).encode())
+
+# Номер группы -> (исходный паттерн, описание, data_type для metadata).
+# Совпадение определяется по lastindex: для байтовых паттернов RE2 отдает имена групп как bytes.
+_SENSITIVE_GROUP_INDEX = {
+    name.decode() if isinstance(name, bytes) else name: index
+    for name, index in SENSITIVE_DATA_RE.groupindex.items()
+}
+SENSITIVE_PATTERN_INFO = {
+    _SENSITIVE_GROUP_INDEX[f"sensitive_{i}"]: (pattern, description, description.lower())
+    for i, (pattern, description) in enumerate(SENSITIVE_PATTERNS)
+}
+
+# Применяется к сообщению в нижнем регистре
+INSECURE_PROTOCOL_RE = re.compile(r'protocol.*=.*http')
+
+# Рекомендации общие для всех findings одного типа - кортежи создаются один раз на модуль
+SENSITIVE_DATA_RECOMMENDATIONS = (
+    "Remove sensitive data from logs and configurations",
+    "Use environment variables or secret management systems",
+    "Implement proper logging filters",
+    "Rotate exposed credentials immediately",
+)
+PUBLIC_ACCESS_RECOMMENDATIONS = (
+    "Restrict resource access to specific IP ranges",
+    "Use security groups and network policies",
+    "Implement private networking where possible",
+)
+INSECURE_PROTOCOL_RECOMMENDATIONS = (
+    "Use HTTPS instead of HTTP",
+    "Configure proper TLS/SSL certificates",
+    "Enable encryption in transit",
+)
+
+SEVERITY_LEVELS = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+SEVERITY_RANK = {level: rank for rank, level in enumerate(SEVERITY_LEVELS)}
 
 class SecurityScannerService(plugin_pb2_grpc.PluginServiceServicer):
     def __init__(self):
         self.name = "security-scanner"
         self.version = "1.0.0"
-        self.sensitive_patterns = [
-            (r'api[_-]?key\s*[=:]\s*[\'\"][^\'\"]+[\'\"]', "API Key exposure"),
-            (r'password\s*[=:]\s*[\'\"][^\'\"]+[\'\"]', "Password exposure"),
-            (r'secret\s*[=:]\s*[\'\"][^\'\"]+[\'\"]', "Secret exposure"),
-            (r'token\s*[=:]\s*[\'\"][^\'\"]+[\'\"]', "Token exposure"),
-            (r'-----BEGIN (RSA|EC|DSA|OPENSSH) PRIVATE KEY-----', "Private key exposure"),
-        ]
+        self.sensitive_patterns = SENSITIVE_PATTERNS
+        self._pool = futures.ThreadPoolExecutor(max_workers=os.cpu_count())
     
     def HealthCheck(self, request, context):
         return plugin_pb2.HealthResponse(
@@ -40,47 +143,26 @@ class SecurityScannerService(plugin_pb2_grpc.PluginServiceServicer):
             findings = []
             sensitive_data_found = False
             
-            for entry in request.entries:
-                # Проверяем на чувствительные данные
-                for pattern, description in self.sensitive_patterns:
-                    if re.search(pattern, entry.message, re.IGNORECASE):
-                        findings.append(plugin_pb2.Finding(
-                            type="SENSITIVE_DATA_EXPOSURE",
-                            severity="CRITICAL",
-                            message=f"Potential {description} detected in logs",
-                            resource=entry.metadata.get("resource", "unknown"),
-                            recommendations=[
-                                "Remove sensitive data from logs and configurations",
-                                "Use environment variables or secret management systems",
-                                "Implement proper logging filters",
-                                "Rotate exposed credentials immediately"
-                            ],
-                            metadata={
-                                "pattern_matched": pattern,
-                                "data_type": description.lower(),
-                                "log_entry": entry.message[:100] + "..." if len(entry.message) > 100 else entry.message
-                            }
-                        ))
-                        sensitive_data_found = True
-                        break
-            
-            # Проверяем security best practices
-            security_issues = self._check_security_practices(request.entries)
-            findings.extend(security_issues)
+            # Параметр читается прямо из proto map, без копии в dict
+            scan_sensitive_data = request.parameters.get("scan_sensitive_data", "true").lower() != "false"
+            scan_chunk = partial(self._scan_chunk, scan_sensitive_data=scan_sensitive_data)
+            for chunk_findings, chunk_sensitive_found in scan_in_chunks(self._pool, scan_chunk, request.entries):
+                findings.extend(chunk_findings)
+                sensitive_data_found = sensitive_data_found or chunk_sensitive_found
             
             return plugin_pb2.ProcessResponse(
                 result=plugin_pb2.AnalysisResult(
                     summary=f"Security scan completed: {len(findings)} security findings",
                     processed_count=len(request.entries),
                     finding_count=len(findings),
-                    severity_level="CRITICAL" if sensitive_data_found else "LOW"
+                    severity_level=self._calculate_severity(findings)
                 ),
                 findings=findings,
                 metrics={
                     "scanned_entries": str(len(request.entries)),
                     "security_findings": str(len(findings)),
                     "sensitive_data_found": str(sensitive_data_found),
-                    "patterns_checked": str(len(self.sensitive_patterns))
+                    "patterns_checked": str(len(self.sensitive_patterns) if scan_sensitive_data else 0)
                 }
             )
             
@@ -89,45 +171,126 @@ class SecurityScannerService(plugin_pb2_grpc.PluginServiceServicer):
             context.set_details(f"Security scan failed: {str(e)}")
             return plugin_pb2.ProcessResponse()
     
-    def _check_security_practices(self, entries: List) -> List:
-        """Проверка security best practices"""
+    def _calculate_severity(self, findings: List) -> str:
+        """Максимальная severity среди findings за один проход (LOW, если findings нет)"""
+        best = 0
+        for finding in findings:
+            rank = SEVERITY_RANK.get(finding.severity, 0)
+            if rank > best:
+                best = rank
+                if best == len(SEVERITY_LEVELS) - 1:
+                    break
+        return SEVERITY_LEVELS[best]
+    
+    def _scan_chunk(self, entries, scan_sensitive_data: bool = True) -> Tuple[List, bool]:
+        """Полная проверка одного чанка записей за один проход по записям"""
+        if scan_sensitive_data:
+            sensitive_data = self._find_sensitive_data([entry.message for entry in entries])
+        else:
+            sensitive_data = {}
+        
         findings = []
+        for index, entry in enumerate(entries):
+            matches, offset = sensitive_data.get(index, (None, 0))
+            findings.extend(self._scan_entry(entry, entry.message.lower(), matches, offset))
+        return findings, bool(sensitive_data)
+    
+    def _find_sensitive_data(self, messages: List[str]) -> Dict[int, Tuple[List, int]]:
+        """Поиск чувствительных данных сразу во всех сообщениях чанка.
         
-        for entry in entries:
-            message = entry.message.lower()
-            
-            # Проверяем на публичные ресурсы
-            if any(pattern in message for pattern in ["0.0.0.0/0", "::/0", "public", "0.0.0.0"]):
-                findings.append(plugin_pb2.Finding(
-                    type="PUBLIC_ACCESS_CONFIGURED",
-                    severity="HIGH",
-                    message="Resource configured with public access",
-                    resource=entry.metadata.get("resource", "unknown"),
-                    recommendations=[
-                        "Restrict resource access to specific IP ranges",
-                        "Use security groups and network policies",
-                        "Implement private networking where possible"
-                    ]
-                ))
-            
-            # Проверяем на небезопасные протоколы
-            if "protocol.*=.*http" in message and "https" not in message:
-                findings.append(plugin_pb2.Finding(
-                    type="INSECURE_PROTOCOL",
-                    severity="MEDIUM",
-                    message="HTTP protocol detected - use HTTPS",
-                    resource=entry.metadata.get("resource", "unknown"),
-                    recommendations=[
-                        "Use HTTPS instead of HTTP",
-                        "Configure proper TLS/SSL certificates",
-                        "Enable encryption in transit"
-                    ]
-                ))
+        Возвращает для индекса записи ее совпадения и байтовое смещение сообщения в буфере,
+        по которому они найдены (0 для сообщений, проверенных отдельно).
+        """
+        # В буфер попадают только сообщения, прошедшие дешевый префильтр
+        candidates = []
+        sensitive_data = {}
+        for index, message in enumerate(messages):
+            if not _may_contain_sensitive_data(message):
+                continue
+            encoded = message.encode()
+            if ENTRY_SEPARATOR in encoded:
+                # NUL в самом сообщении: проверяем его отдельно, без ограничения на разделитель
+                matches = list(SENSITIVE_DATA_SINGLE_RE.finditer(encoded))
+                if matches:
+                    sensitive_data[index] = (matches, 0)
+            else:
+                candidates.append((index, encoded))
+        if not candidates:
+            return sensitive_data
+        
+        batch_text = ENTRY_SEPARATOR.join(encoded for _, encoded in candidates)
+        offsets = list(accumulate((len(encoded) + 1 for _, encoded in candidates), initial=0))
+        
+        matches_by_position = {}
+        for match in SENSITIVE_DATA_RE.finditer(batch_text):
+            position = bisect_right(offsets, match.start()) - 1
+            matches_by_position.setdefault(position, []).append(match)
+        
+        for position, matches in matches_by_position.items():
+            sensitive_data[candidates[position][0]] = (matches, offsets[position])
+        return sensitive_data
+    
+    def _scan_entry(self, entry, lowered: str, sensitive_matches: List = None, offset: int = 0):
+        """Все проверки одной записи; lowered - сообщение в нижнем регистре"""
+        resource = entry.metadata.get("resource", "unknown")
+        
+        # Чувствительные данные (совпадения найдены заранее по всему чанку)
+        if sensitive_matches:
+            pattern, description, data_type = SENSITIVE_PATTERN_INFO[sensitive_matches[0].lastindex]
+            masked_message = self._mask_sensitive_data(entry.message.encode(), sensitive_matches, offset).decode()
+            yield plugin_pb2.Finding(
+                type="SENSITIVE_DATA_EXPOSURE",
+                severity="CRITICAL",
+                message=f"Potential {description} detected in logs",
+                resource=resource,
+                recommendations=SENSITIVE_DATA_RECOMMENDATIONS,
+                metadata={
+                    "pattern_matched": pattern,
+                    "data_type": data_type,
+                    "log_entry": masked_message[:100] + "..." if len(masked_message) > 100 else masked_message
+                }
+            )
+        
+        # Проверяем на публичные ресурсы
+        if PUBLIC_ACCESS_RE.search(lowered):
+            yield plugin_pb2.Finding(
+                type="PUBLIC_ACCESS_CONFIGURED",
+                severity="HIGH",
+                message="Resource configured with public access",
+                resource=resource,
+                recommendations=PUBLIC_ACCESS_RECOMMENDATIONS
+            )
+        
+        # Проверяем на небезопасные протоколы
+        if "https" not in lowered and INSECURE_PROTOCOL_RE.search(lowered):
+            yield plugin_pb2.Finding(
+                type="INSECURE_PROTOCOL",
+                severity="MEDIUM",
+                message="HTTP protocol detected - use HTTPS",
+                resource=resource,
+                recommendations=INSECURE_PROTOCOL_RECOMMENDATIONS
+            )
+    
+    def _mask_sensitive_data(self, message: bytes, matches: List, offset: int = 0) -> bytes:
+        """Замена найденных фрагментов на [REDACTED] по позициям совпадений, без повторного прохода regex.
         
-        return findings
+        message - сообщение в UTF-8, offset - его позиция в буфере, по которому искались совпадения.
+        Границы совпадений всегда приходятся на ASCII-символы, поэтому результат остается валидным UTF-8.
+        """
+        parts = []
+        prev = 0
+        for match in matches:
+            parts.append(message[prev:match.start() - offset])
+            parts.append(b"[REDACTED]")
+            prev = match.end() - offset
+        parts.append(message[prev:])
+        return b"".join(parts)
 
 def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=server_max_workers()),
+        options=SERVER_OPTIONS
+    )
     plugin_pb2_grpc.add_PluginServiceServicer_to_server(SecurityScannerService(), server)
     server.add_insecure_port('[::]:50052')
     server.start()
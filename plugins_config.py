@@ -3,40 +3,61 @@ import time
 import grpc
 from concurrent import futures
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, NamedTuple, Tuple, Union
 import json
 
 from plugins.models import plugin_pb2, plugin_pb2_grpc
+from schemas.api import LogEntries
 
-# Конфигурация плагинов
+class PluginSpec(NamedTuple):
+    """Описание плагина: имя, адрес gRPC сервера и возможности"""
+    name: str
+    host: str
+    port: int
+    description: str
+    capabilities: Tuple[str, ...]
 
 # Конфигурация плагинов
-PLUGINS_CONFIG = {
-    "error-aggregator": {
-        "host": "error-aggregator",
-        "port": 50051,
-        "description": "Анализатор ошибок и паттернов",
-        "capabilities": ["error_analysis", "pattern_detection"]
-    },
-    "security-scanner": {
-        "host": "security-scanner", 
-        "port": 50052,
-        "description": "Сканер безопасности и чувствительных данных",
-        "capabilities": ["security_scanning", "sensitive_data_detection"]
-    },
-    "performance-analyzer": {
-        "host": "performance-analyzer",
-        "port": 50053, 
-        "description": "Анализатор производительности",
-        "capabilities": ["performance_analysis", "bottleneck_detection"]
-    }
-}
+PLUGINS_CONFIG = (
+    PluginSpec(
+        name="error-aggregator",
+        host="error-aggregator",
+        port=50051,
+        description="Анализатор ошибок и паттернов",
+        capabilities=("error_analysis", "pattern_detection")
+    ),
+    PluginSpec(
+        name="security-scanner",
+        host="security-scanner",
+        port=50052,
+        description="Сканер безопасности и чувствительных данных",
+        capabilities=("security_scanning", "sensitive_data_detection")
+    ),
+    PluginSpec(
+        name="performance-analyzer",
+        host="performance-analyzer",
+        port=50053,
+        description="Анализатор производительности",
+        capabilities=("performance_analysis", "bottleneck_detection")
+    ),
+)
+
+# Параметры канала к плагинам: лимит сообщений поднят с 4MB по умолчанию до 64MB,
+# keepalive держит соединение теплым между запросами, локальный пул subchannel
+# не делится с другими каналами процесса
+CHANNEL_OPTIONS = [
+    ("grpc.max_receive_message_length", 64 * 1024 * 1024),
+    ("grpc.max_send_message_length", 64 * 1024 * 1024),
+    ("grpc.keepalive_time_ms", 30_000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.use_local_subchannel_pool", 1),
+]
 
 class PluginClient:
-    def __init__(self, plugin_name: str, config: dict):
-        self.name = plugin_name
-        self.config = config
-        self.endpoint = f"{config['host']}:{config['port']}"
+    def __init__(self, spec: PluginSpec):
+        self.name = spec.name
+        self.config = spec
+        self.endpoint = f"{spec.host}:{spec.port}"
         self.channel = None
         self.stub = None
         self.connected = False
@@ -45,7 +66,7 @@ class PluginClient:
     def connect(self) -> bool:
         """Установка соединения с плагином"""
         try:
-            self.channel = grpc.insecure_channel(self.endpoint)
+            self.channel = grpc.insecure_channel(self.endpoint, options=CHANNEL_OPTIONS)
             self.stub = plugin_pb2_grpc.PluginServiceStub(self.channel)
             
             # Проверяем соединение
@@ -124,7 +145,7 @@ class PluginClient:
                 "plugin": self.name
             }
     
-    def process_logs(self, log_entries: List[Dict], parameters: Dict[str, str] = None) -> Dict[str, Any]:
+    def process_logs(self, log_entries: Union[List[Dict], LogEntries], parameters: Dict[str, str] = None) -> Dict[str, Any]:
         """Обработка логов через плагин"""
         try:
             if not self.stub:
@@ -133,27 +154,36 @@ class PluginClient:
             if parameters is None:
                 parameters = {}
             
-            # Конвертируем log_entries в gRPC сообщения
-            entries_proto = []
-            for entry in log_entries:
+            # Создаем запрос
+            request = plugin_pb2.ProcessRequest(
+                parameters={str(k): str(v) for k, v in parameters.items()}
+            )
+            
+            # Записи приходят списком dict или колоночным LogEntries
+            if isinstance(log_entries, LogEntries):
+                rows = log_entries.rows()
+            else:
+                rows = (
+                    (entry.get('level', 'info'), entry.get('message', ''),
+                     entry.get('timestamp', ''), entry.get('metadata'))
+                    for entry in log_entries
+                )
+            
+            # Конвертируем log_entries в gRPC сообщения прямо внутри запроса:
+            # без промежуточного списка LogEntry и его копирования в repeated-поле.
+            # Запрос не делится на части - плагины агрегируют результаты по всем записям сразу.
+            for level, message, timestamp, entry_metadata in rows:
                 # Создаем metadata как dict
                 metadata = {}
-                if 'metadata' in entry and isinstance(entry['metadata'], dict):
-                    metadata = {str(k): str(v) for k, v in entry['metadata'].items()}
+                if isinstance(entry_metadata, dict):
+                    metadata = {str(k): str(v) for k, v in entry_metadata.items()}
                 
-                entry_proto = plugin_pb2.LogEntry(
-                    level=str(entry.get('level', 'info')),
-                    message=str(entry.get('message', '')),
-                    timestamp=str(entry.get('timestamp', '')),
+                request.entries.add(
+                    level=str(level),
+                    message=str(message),
+                    timestamp=str(timestamp),
                     metadata=metadata
                 )
-                entries_proto.append(entry_proto)
-            
-            # Создаем запрос
-            request = plugin_pb2.ProcessRequest(
-                entries=entries_proto,
-                parameters={str(k): str(v) for k, v in parameters.items()}
-            )
             
             # Вызываем плагин с таймаутом
             start_time = time.time()
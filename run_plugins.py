@@ -2,12 +2,30 @@
 import atexit
 import os
 import signal
+import socket
 import subprocess
 import sys
 import time
 
 
-processes = []
+# pid -> (процесс, скрипт, порт) запущенных плагинов
+processes = {}
+
+# Ожидание готовности плагина: до 100 попыток подключения к его порту с шагом 50 мс
+READINESS_ATTEMPTS = 100
+READINESS_INTERVAL = 0.05
+
+def wait_for_port(process, port):
+    """Ожидание, пока плагин начнет принимать соединения на своем порту"""
+    for _ in range(READINESS_ATTEMPTS):
+        # Процесс упал при старте - ждать дальше нет смысла
+        if process.poll() is not None:
+            return False
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return True
+        time.sleep(READINESS_INTERVAL)
+    return False
 
 def start_plugin(script_name, port):
     """Запуск плагина в отдельном процессе"""
@@ -16,24 +34,51 @@ def start_plugin(script_name, port):
     # В Docker используем прямой запуск Python
     cmd = [sys.executable, script_name]
     process = subprocess.Popen(cmd, env=env)
-    processes.append(process)
+    processes[process.pid] = (process, script_name, port)
     
-    # Даем больше времени на запуск в Docker
-    time.sleep(3)
-    
-    # Проверяем, что процесс жив
-    if process.poll() is None:
+    # Ждем, пока gRPC сервер плагина займет порт
+    if wait_for_port(process, port):
         print(f"✅ Started {script_name} on port {port}")
         return process
     else:
         print(f"❌ Failed to start {script_name}")
-        processes.remove(process)
+        # Процесс мог зависнуть, так и не открыв порт
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        del processes[process.pid]
         return None
 
+def reap_dead_plugins():
+    """Завершившиеся плагины: (процесс, скрипт, порт) для каждого, убранные из processes"""
+    dead = []
+    if not hasattr(os, "WNOHANG"):
+        # Windows: waitpid без WNOHANG блокирует, опрашиваем процессы по очереди
+        for pid, (process, script, port) in list(processes.items()):
+            if process.poll() is not None:
+                dead.append(processes.pop(pid))
+        return dead
+    
+    # Один системный вызов на проверку: waitpid(-1) возвращает любого завершившегося потомка
+    while True:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid == 0:
+            break
+        if pid in processes:
+            process, script, port = processes.pop(pid)
+            # Процесс уже собран waitpid: сообщаем Popen код завершения, иначе он считает
+            # процесс живым и может позже опросить pid, занятый перезапущенным плагином
+            process.returncode = os.waitstatus_to_exitcode(status)
+            dead.append((process, script, port))
+    return dead
+
 def cleanup():
     """Остановка всех процессов"""
     print("\n🛑 Stopping plugins...")
-    for process in processes:
+    for process, _, _ in list(processes.values()):
         try:
             process.terminate()
             process.wait(timeout=5)
@@ -88,16 +133,17 @@ def main():
     
     # Бесконечный цикл чтобы процессы не завершались
     try:
+        # Плагины, которые не удалось перезапустить, пробуем снова на следующей итерации
+        pending_restarts = []
         while True:
             # Проверяем статус процессов и перезапускаем упавшие
-            for i, process in enumerate(processes[:]):
-                if process.poll() is not None:
-                    print(f"⚠️ Plugin died, restarting...")
-                    # Находим соответствующий скрипт и порт
-                    script, port = plugins[i]
-                    new_process = start_plugin(script, port)
-                    if new_process:
-                        processes[i] = new_process
+            for _, script, port in reap_dead_plugins():
+                print(f"⚠️ Plugin {script} died, restarting...")
+                pending_restarts.append((script, port))
+            pending_restarts = [
+                (script, port) for script, port in pending_restarts
+                if start_plugin(script, port) is None
+            ]
             
             time.sleep(5)
     except KeyboardInterrupt:
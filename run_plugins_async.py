@@ -0,0 +1,80 @@
+
+import asyncio
+import logging
+import os
+import signal
+import sys
+from concurrent import futures
+
+import grpc
+
+# Плагины импортируют модели как `from models import ...`, как при запуске из plugins/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "plugins"))
+
+from base_plugin import SERVER_OPTIONS, server_max_workers
+from error_aggregator import ErrorAggregatorService
+from models import plugin_pb2_grpc
+from performance_analyzer import PerformanceAnalyzerService
+from security_scanner import SecurityScannerService
+
+
+# Все плагины работают в одном процессе: один интерпретатор, общий кэш модулей и один GC
+PLUGINS = [
+    (ErrorAggregatorService, 50051),
+    (SecurityScannerService, 50052),
+    (PerformanceAnalyzerService, 50053),
+]
+
+# Общий пул для синхронных обработчиков всех плагинов; gRPC не принимает больше RPC, чем пул может обслужить
+MAX_WORKERS = server_max_workers()
+
+async def serve_plugin(servicer, port, executor):
+    """Запуск gRPC сервера одного плагина в общем event loop"""
+    # Обработчики плагинов синхронные - grpc.aio выполняет их в общем пуле потоков
+    server = grpc.aio.server(
+        migration_thread_pool=executor,
+        options=SERVER_OPTIONS
+    )
+    plugin_pb2_grpc.add_PluginServiceServicer_to_server(servicer, server)
+    server.add_insecure_port(f'[::]:{port}')
+    await server.start()
+    print(f"✅ Started {servicer.name} on port {port}")
+    return server
+
+async def main():
+    print("🚀 Starting Terraform Analysis Plugins in a single process...")
+
+    executor = futures.ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    servers = [await serve_plugin(service(), port, executor) for service, port in PLUGINS]
+
+    print(f"\n🎉 Started {len(servers)}/{len(PLUGINS)} plugins")
+    print("\nPress Ctrl+C to stop all plugins")
+
+    # Останавливаемся по Ctrl+C или SIGTERM (docker stop)
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    try:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop_event.set)
+    except NotImplementedError:
+        # Windows: event loop не поддерживает обработчики сигналов, Ctrl+C ловим ниже
+        pass
+    
+    try:
+        await stop_event.wait()
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        # Без обработчика сигналов Ctrl+C прерывает ожидание: asyncio.run отменяет задачу
+        pass
+
+    print("\n🛑 Stopping plugins...")
+    await asyncio.gather(*(server.stop(5) for server in servers))
+    executor.shutdown(wait=False)
+    print("✅ All plugins stopped")
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        # Плагины уже остановлены в main(), asyncio.run лишь повторно сообщает о Ctrl+C
+        pass
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from enum import Enum
 
 class SeverityLevel(str, Enum):
@@ -16,12 +16,45 @@ class PluginInfo(BaseModel):
     supported_parameters: List[str]
 
 class LogEntry(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     level: str
     message: str
     timestamp: str
-    metadata: Dict[str, str] = {}
+    metadata: Dict[str, Any] = {}
+
+class LogEntries:
+    """Записи лога в колоночном виде: параллельные списки полей вместо списка LogEntry.
+    
+    Потребитель, которому нужно одно-два поля, проходит только по их спискам.
+    """
+    __slots__ = ("levels", "messages", "timestamps", "metadata")
+
+    def __init__(self):
+        self.levels: List[str] = []
+        self.messages: List[str] = []
+        self.timestamps: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+
+    def append(self, level: str, message: str, timestamp: str, metadata: Dict[str, Any]):
+        self.levels.append(level)
+        self.messages.append(message)
+        self.timestamps.append(timestamp)
+        self.metadata.append(metadata)
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def __getitem__(self, index: int) -> Tuple[str, str, str, Dict[str, Any]]:
+        return self.levels[index], self.messages[index], self.timestamps[index], self.metadata[index]
+
+    def rows(self) -> Iterator[Tuple[str, str, str, Dict[str, Any]]]:
+        """Записи построчно: (level, message, timestamp, metadata)"""
+        return zip(self.levels, self.messages, self.timestamps, self.metadata)
 
 class Finding(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     type: str
     severity: SeverityLevel
     message: str
@@ -62,11 +95,12 @@ class APIResponse(BaseModel):
     data: Optional[Any] = None
     message: Optional[str] = None
 
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "status": "success",
                 "data": {"key": "value"},
                 "message": "Operation completed successfully"
             }
-        }
\ No newline at end of file
+        }
+    )
\ No newline at end of file
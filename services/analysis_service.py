@@ -1,17 +1,123 @@
+import asyncio
 import json
 import logging
-from typing import List, Dict, Any
+import mmap
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # orjson не установлен - используется стандартный json
+    orjson = None
+
 from plugins.manager import PluginManager
-from schemas.api import LogEntry, AnalysisResponse
+from schemas.api import LogEntries, AnalysisResponse, Finding
 from core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# orjson разбирает строку лога прямо из bytes; json.loads тоже принимает bytes.
+# orjson.JSONDecodeError наследуется от json.JSONDecodeError, поэтому обработка ошибок общая.
+json_loads = (orjson or json).loads
+
+FINDINGS_ADAPTER = TypeAdapter(List[Finding])
+
+# Число строк лога, которые разбираются одним вызовом json_loads
+PARSE_BATCH_LINES = 10000
+
+# Процессов разбора не больше настройки и не больше ядер, доступных процессу
+PARSE_WORKERS = max(1, min(
+    settings.PARSE_WORKERS,
+    len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+))
+
+# Пул процессов для разбора больших файлов логов, создается при первом использовании
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    """Общий пул процессов для разбора больших файлов логов.
+    
+    Процессы запускаются через forkserver (spawn, где его нет), а не fork: в процессе
+    API уже работают потоки gRPC каналов PluginManager, а fork при живых потоках gRPC
+    может повесить дочерний процесс.
+    """
+    global _parse_pool
+    if _parse_pool is None:
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=PARSE_WORKERS,
+            mp_context=multiprocessing.get_context(method)
+        )
+    return _parse_pool
+
+def _parse_lines(lines: List[bytes]) -> List[Any]:
+    """Разбор пачки строк JSON лога одним вызовом json_loads.
+    
+    Строки склеиваются в JSON массив через ",\\n": перевод строки не может стоять внутри
+    JSON строки, поэтому значение не может перетечь через границу строк. Если пачка не
+    разбирается или число значений не совпадает с числом строк, строки разбираются
+    по одной, а битые пропускаются - вызывающий код видит их по разнице в длине.
+    """
+    if not lines:
+        return []
+    
+    try:
+        values = json_loads(b"[" + b",\n".join(lines) + b"]")
+        if len(values) == len(lines):
+            return values
+    except json.JSONDecodeError:
+        pass
+    
+    values = []
+    for line in lines:
+        try:
+            values.append(json_loads(line))
+        except json.JSONDecodeError as e:
+            # Подробности по каждой строке - только в DEBUG, без форматирования на INFO
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Failed to parse log line: %s", e)
+    return values
+
+def _parse_mapped_lines(mm: mmap.mmap, start: int, end: int) -> Tuple[List[Any], int]:
+    """Разбор строк отображенного в память файла лога в диапазоне байт [start, end).
+    
+    Возвращает разобранные значения и число пропущенных битых строк.
+    """
+    values = []
+    batch = []
+    line_count = 0
+    mm.seek(start)
+    while mm.tell() < end:
+        line = mm.readline().strip()
+        if line:
+            batch.append(line)
+            if len(batch) == PARSE_BATCH_LINES:
+                values.extend(_parse_lines(batch))
+                line_count += len(batch)
+                batch = []
+    values.extend(_parse_lines(batch))
+    line_count += len(batch)
+    return values, line_count - len(values)
+
+def _parse_file_range(path: str, start: int, end: int) -> Tuple[List[Any], int]:
+    """Разбор диапазона байт [start, end) файла лога в процессе пула"""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return _parse_mapped_lines(mm, start, end)
+
 class AnalysisService:
     def __init__(self):
         self.plugin_manager = PluginManager()
+        self._plugins_cache = None
+        self._plugins_cache_ts = 0.0
+        self._plugins_cache_lock = asyncio.Lock()
     
     async def analyze_log_file(self, filename: str, plugin_names: List[str], parameters: Dict[str, str] = None) -> AnalysisResponse:
         """Анализ файла лога с помощью выбранных плагинов"""
@@ -31,7 +137,7 @@ class AnalysisService:
                 )
             
             # Обнаруживаем плагины
-            available_plugins = await self.plugin_manager.discover_plugins()
+            available_plugins = await self._discover_plugins()
             
             # Фильтруем запрошенные плагины по доступным
             valid_plugins = [p for p in plugin_names if p in available_plugins]
@@ -53,20 +159,36 @@ class AnalysisService:
             all_findings = []
             all_metrics = {}
             
-            for plugin_name in valid_plugins:
-                logger.info(f"Processing with plugin: {plugin_name}")
-                result = await self.plugin_manager.process_with_plugin(
-                    plugin_name, log_entries, parameters
-                )
+            # Плагины работают параллельно, не больше MAX_CONCURRENT_PLUGINS одновременно
+            semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_PLUGINS)
+            
+            async def run_plugin(plugin_name: str):
+                async with semaphore:
+                    logger.info("Processing with plugin: %s", plugin_name)
+                    return await self.plugin_manager.process_with_plugin(
+                        plugin_name, log_entries, parameters
+                    )
+            
+            results = await asyncio.gather(
+                *(run_plugin(plugin_name) for plugin_name in valid_plugins),
+                return_exceptions=True
+            )
+            
+            for plugin_name, result in zip(valid_plugins, results):
+                # Ошибка одного плагина не прерывает анализ остальными
+                if isinstance(result, Exception):
+                    logger.error(f"Plugin {plugin_name} failed: {result}")
+                    continue
                 
                 if result:
                     plugin_results[plugin_name] = result
                     
-                    # Добавляем findings с информацией о плагине
-                    for finding in result.findings:
-                        finding_dict = finding.dict()
+                    # Добавляем findings с информацией о плагине: все findings плагина
+                    # сериализуются одним вызовом pydantic-core вместо dict() на каждый
+                    finding_dicts = FINDINGS_ADAPTER.dump_python(result.findings)
+                    for finding_dict in finding_dicts:
                         finding_dict["plugin"] = plugin_name
-                        all_findings.append(finding_dict)
+                    all_findings.extend(finding_dicts)
                     
                     # Сохраняем метрики
                     all_metrics[plugin_name] = result.metrics
@@ -97,38 +219,100 @@ class AnalysisService:
                 }
             )
     
-    async def _load_log_file(self, filename: str) -> List[LogEntry]:
-        """Загрузка и парсинг файла лога"""
+    async def _discover_plugins(self) -> frozenset:
+        """Имена доступных плагинов из кэша, если он не старше PLUGIN_CACHE_TTL"""
+        async with self._plugins_cache_lock:
+            # Под блокировкой параллельные запросы ждут одно обнаружение, а не запускают свои
+            if self._plugins_cache is None or time.monotonic() - self._plugins_cache_ts >= settings.PLUGIN_CACHE_TTL:
+                self._plugins_cache = frozenset(await self.plugin_manager.discover_plugins())
+                self._plugins_cache_ts = time.monotonic()
+            return self._plugins_cache
+    
+    async def _load_log_file(self, filename: str) -> LogEntries:
+        """Загрузка и парсинг файла лога в колоночный LogEntries"""
         try:
             file_path = Path(settings.LOGS_DIR) / filename
             
             if not file_path.exists():
                 logger.error(f"File not found: {file_path}")
-                return []
+                return LogEntries()
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
+            # Парсим JSON лог (каждая строка - JSON объект) по мере чтения файла,
+            # не держа в памяти весь файл и список его строк
+            log_entries = LogEntries()
+            with open(file_path, 'rb') as f:
+                # Пустой файл нельзя отобразить в память
+                if os.fstat(f.fileno()).st_size == 0:
+                    logger.info(f"Loaded 0 log entries from {filename}")
+                    return log_entries
                 
-            # Парсим JSON лог (каждая строка - JSON объект)
-            log_entries = []
-            for line in content.split('\n'):
-                if line.strip():
-                    try:
-                        log_data = json.loads(line)
-                        entry = LogEntry(
-                            level=log_data.get("@level", "info"),
-                            message=log_data.get("@message", ""),
-                            timestamp=log_data.get("@timestamp", ""),
-                            metadata=log_data  # сохраняем все данные как metadata
-                        )
-                        log_entries.append(entry)
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"Failed to parse log line: {e}")
-                        continue
+                # Файл отображается в память: страницы подгружаются ядром по мере
+                # чтения, без копирования через буфер файлового объекта
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if len(mm) > settings.PARALLEL_PARSE_THRESHOLD:
+                        parsed = await self._parse_parallel(file_path, mm)
+                    else:
+                        parsed = [_parse_mapped_lines(mm, 0, len(mm))]
+                    
+                    # Битые строки не логируются по одной - одно итоговое предупреждение на файл
+                    bad_count = 0
+                    for values, skipped in parsed:
+                        self._add_entries(log_entries, values)
+                        bad_count += skipped
             
+            if bad_count:
+                logger.warning("Skipped %d malformed log lines in %s", bad_count, filename)
             logger.info(f"Loaded {len(log_entries)} log entries from {filename}")
             return log_entries
             
         except Exception as e:
             logger.error(f"Failed to load log file {filename}: {e}")
-            return []
\ No newline at end of file
+            return LogEntries()
+    
+    async def _parse_parallel(self, file_path: Path, mm: mmap.mmap) -> List[Tuple[List[Any], int]]:
+        """Разбор большого файла лога по диапазонам байт в общем пуле процессов.
+        
+        Границы диапазонов сдвигаются на начало следующей строки, результаты
+        возвращаются в порядке диапазонов. Event loop не блокируется на время разбора.
+        """
+        size = len(mm)
+        bounds = [0]
+        for i in range(1, PARSE_WORKERS):
+            newline = mm.find(b"\n", max(size * i // PARSE_WORKERS, bounds[-1]))
+            if newline == -1:
+                break
+            bounds.append(newline + 1)
+        bounds.append(size)
+        
+        global _parse_pool
+        loop = asyncio.get_running_loop()
+        pool = _get_parse_pool()
+        try:
+            return await asyncio.gather(*(
+                loop.run_in_executor(pool, _parse_file_range, str(file_path), start, end)
+                for start, end in zip(bounds, bounds[1:])
+            ))
+        except BrokenProcessPool:
+            # Упавший процесс ломает весь пул: следующий разбор создаст новый
+            if _parse_pool is pool:
+                _parse_pool = None
+            raise
+    
+    def _add_entries(self, log_entries: LogEntries, values: List[Dict[str, Any]]):
+        """Добавление разобранных строк лога в колонки log_entries"""
+        append = log_entries.append
+        intern = sys.intern
+        for log_data in values:
+            # Уровней всего несколько: интернированная строка одна на весь файл
+            # вместо отдельного объекта на каждую запись
+            level = log_data.pop("@level", "info")
+            if type(level) is str:
+                level = intern(level)
+            # Поля level/message/timestamp извлекаются из записи, остальные данные
+            # остаются metadata - по ссылке, без копии и без дублирования полей
+            append(
+                level,
+                log_data.pop("@message", ""),
+                log_data.pop("@timestamp", ""),
+                log_data
+            )
\ No newline at end of file
@@ -1,31 +1,55 @@
+import io
 import os
 import shutil
+import stat
+import tempfile
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 import logging
+import re
 
 from core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Расширения файлов логов, которые показываются в списке
+LOG_FILE_SUFFIXES = frozenset({'.json', '.log', '.txt'})
+
+# Все, кроме букв, цифр, пробела, '-', '_' и '.', удаляется из имени загружаемого файла
+UNSAFE_FILENAME_CHARS_RE = re.compile(r'[^\w .-]+')
+
+# Размер буфера копирования, если os.sendfile недоступен
+COPY_BUFFER_SIZE = 1024 * 1024
+
 class FileService:
     def __init__(self):
         self.logs_dir = Path(settings.LOGS_DIR)
+        # (st_mtime_ns директории логов, отсортированный список файлов) последнего сканирования
+        self._files_cache: Optional[Tuple[int, List[str]]] = None
     
     def get_available_files(self) -> List[str]:
         """Получение списка доступных файлов логов"""
         try:
-            if not self.logs_dir.exists():
+            try:
+                mtime = os.stat(self.logs_dir).st_mtime_ns
+            except FileNotFoundError:
                 self.logs_dir.mkdir(parents=True, exist_ok=True)
                 return []
             
-            # Ищем только JSON файлы
-            files = [
-                f.name for f in self.logs_dir.iterdir() 
-                if f.is_file() and f.suffix.lower() in ['.json', '.log', '.txt']
-            ]
+            # Создание, удаление и переименование файлов меняют mtime директории:
+            # пока он прежний, список не пересканируется
+            if self._files_cache is not None and self._files_cache[0] == mtime:
+                return list(self._files_cache[1])
+            
+            # Ищем только файлы логов; scandir отдает тип файла без отдельного stat на запись
+            with os.scandir(self.logs_dir) as entries:
+                files = sorted(
+                    entry.name for entry in entries
+                    if os.path.splitext(entry.name)[1].lower() in LOG_FILE_SUFFIXES and entry.is_file()
+                )
             
-            return sorted(files)
+            self._files_cache = (mtime, files)
+            return list(files)
             
         except Exception as e:
             logger.error(f"Failed to get file list: {e}")
@@ -34,8 +58,10 @@ class FileService:
     def file_exists(self, filename: str) -> bool:
         """Проверка существования файла"""
         try:
-            file_path = self.logs_dir / filename
-            return file_path.exists() and file_path.is_file()
+            # Один stat вместо exists() + is_file()
+            return stat.S_ISREG(os.stat(self.logs_dir / filename).st_mode)
+        except (FileNotFoundError, NotADirectoryError):
+            return False
         except Exception as e:
             logger.error(f"Error checking file existence: {e}")
             return False
@@ -44,14 +70,17 @@ class FileService:
         """Сохранение загруженного файла"""
         try:
             # Создаем безопасное имя файла
-            safe_filename = "".join(c for c in filename if c.isalnum() or c in (' ', '-', '_', '.')).rstrip()
+            safe_filename = UNSAFE_FILENAME_CHARS_RE.sub('', filename).rstrip()
             
             file_path = self.logs_dir / safe_filename
             
             # Сохраняем файл
             with open(file_path, 'wb') as buffer:
-                shutil.copyfileobj(file.file, buffer)
+                if not self._sendfile(file.file, buffer):
+                    shutil.copyfileobj(file.file, buffer, COPY_BUFFER_SIZE)
             
+            # Изменение могло попасть в тот же тик mtime, что и последнее сканирование
+            self._files_cache = None
             logger.info(f"File saved: {safe_filename}")
             return True
             
@@ -59,15 +88,56 @@ class FileService:
             logger.error(f"Failed to save file {filename}: {e}")
             return False
     
+    def _sendfile(self, source, target) -> bool:
+        """Копирование source в target внутри ядра через os.sendfile.
+        
+        Возвращает False, если источник не поддерживает sendfile и ничего не скопировано.
+        """
+        if not hasattr(os, "sendfile"):
+            return False
+        
+        # Небольшие загрузки SpooledTemporaryFile держит в памяти: fileno() сначала сбросил бы их на диск.
+        # Публичного признака для этого нет - смотрим на внутренний буфер, а если его устройство
+        # другое, просто пробуем fileno() как для обычного файла
+        if isinstance(source, tempfile.SpooledTemporaryFile) and isinstance(getattr(source, "_file", None), io.BytesIO):
+            return False
+        
+        try:
+            in_fd = source.fileno()
+            offset = source.tell()
+            remaining = os.fstat(in_fd).st_size - offset
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            return False
+        
+        target.flush()
+        out_fd = target.fileno()
+        copied = 0
+        while remaining > 0:
+            try:
+                sent = os.sendfile(out_fd, in_fd, offset, remaining)
+            except OSError:
+                if copied:
+                    raise
+                return False
+            if sent == 0:
+                break
+            copied += sent
+            offset += sent
+            remaining -= sent
+        return True
+    
     def delete_file(self, filename: str) -> bool:
         """Удаление файла"""
         try:
             file_path = self.logs_dir / filename
-            if file_path.exists():
+            # Без предварительной проверки exists(): отсутствие файла видно по исключению unlink
+            try:
                 file_path.unlink()
-                logger.info(f"File deleted: {filename}")
-                return True
-            return False
+            except FileNotFoundError:
+                return False
+            self._files_cache = None
+            logger.info(f"File deleted: {filename}")
+            return True
             
         except Exception as e:
             logger.error(f"Failed to delete file {filename}: {e}")
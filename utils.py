@@ -1,10 +1,21 @@
 import os
+from functools import lru_cache
 
 from werkzeug.utils import secure_filename
 
 from settings import UPLOAD_FOLDER, ALLOWED_EXTENSIONS
 
 
+APPLY_FOLDER = os.path.join(UPLOAD_FOLDER, 'apply')
+PLAN_FOLDER = os.path.join(UPLOAD_FOLDER, 'plan')
+
+
+@lru_cache(maxsize=4096)
+def _safe(filename: str) -> str:
+    """secure_filename with memoization for repeatedly requested names"""
+    return secure_filename(filename)
+
+
 def is_allowed_file(filename: str):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -12,20 +23,17 @@ def is_allowed_file(filename: str):
 
 def get_file_path(filename: str):
     """Get safe file path within upload folder"""
-    safe_filename = secure_filename(filename)
-    return os.path.join(UPLOAD_FOLDER, safe_filename)
+    return os.path.join(UPLOAD_FOLDER, _safe(filename))
 
 
 def get_apply_file_path(filename: str):
     """Get safe file path within upload folder"""
-    safe_filename = secure_filename(filename)
-    return os.path.join(UPLOAD_FOLDER, 'apply', safe_filename)
+    return os.path.join(APPLY_FOLDER, _safe(filename))
 
 
 def get_plan_file_path(filename: str):
     """Get safe file path within upload folder"""
-    safe_filename = secure_filename(filename)
-    return os.path.join(UPLOAD_FOLDER, 'plan', safe_filename)
+    return os.path.join(PLAN_FOLDER, _safe(filename))
 
 
 def is_file_exists(filename: str):